@@ -1,44 +1,183 @@
 import asyncio
+import atexit
+import collections
+import concurrent.futures
+import functools
 import hashlib
-import hmac
 import json
 import logging
-import queue
 import threading
 import time
-from typing import Any, Dict, Iterable
+import weakref
+from typing import Any, Counter, Deque, Dict, Iterable, List, Optional, Tuple, Union
 
 import requests
+import requests.adapters
 import websockets.client
 import websockets.exceptions
 
+try:
+    import httpx
+except ImportError:  # only required for the async API
+    httpx = None
+
+try:
+    import h2
+except ImportError:  # httpx falls back to HTTP/1.1
+    h2 = None
+
+try:
+    import orjson
+except ImportError:  # falls back to the standard json module
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # only required for typed messages
+    msgspec = None
+
+try:
+    import uvloop
+except ImportError:  # falls back to the default asyncio event loop
+    uvloop = None
+
 logger = logging.getLogger(__name__)
 
-def _get_signature(time_ms, woo_secret, **sorted_params):
-    query_string = '&'.join(f'{key}={value}' for key, value in sorted_params.items())
+if orjson is not None:
+    _loads = orjson.loads
+    def _dumps(obj) -> str:
+        # Decoded to str, such that the message is still sent as a text frame.
+        return orjson.dumps(obj).decode()
+else:
+    _loads = json.loads
+    _dumps = json.dumps
+
+if msgspec is not None:
+    class Message(msgspec.Struct):
+        """ Base class of the typed messages that receive(..., typed=True) yields
+        for known topics. """
+
+        def to_dict(self) -> Dict[str, Any]:
+            """ Returns the message as the dict that receive() yields by default. """
+            return msgspec.to_builtins(self)
+
+    class TradeData(Message):
+        symbol: str
+        price: float
+        size: float
+        side: str
+        source: int = 0
+
+    class TradeMsg(Message):
+        topic: str
+        ts: int
+        data: TradeData
+
+    class BboData(Message, rename='camel'):
+        symbol: str
+        ask: float
+        ask_size: float
+        bid: float
+        bid_size: float
+
+    class BboMsg(Message):
+        topic: str
+        ts: int
+        data: BboData
+
+    class _Envelope(msgspec.Struct):
+        topic: str = ''
+
+    _ENVELOPE_DECODER = msgspec.json.Decoder(_Envelope)
+    _TYPED_DECODERS = {
+        'trade': msgspec.json.Decoder(TradeMsg),
+        'bbo': msgspec.json.Decoder(BboMsg),
+    }
+
+_TOPIC_MARKER = '{"topic":"'
+_TOPIC_START = len(_TOPIC_MARKER)
+# The decoder of each topic seen so far, or False for topics without a type.
+_TOPIC_DECODERS: Dict[str, Any] = {}
+
+def _typed_decoder(topic: str):
+    return _TYPED_DECODERS.get(topic.rpartition('@')[2], False)
+
+def _decode(msg, typed=False):
+    """ Decodes the message into a dict, or into a typed message if requested
+    and its topic is known. Messages that do not fit their type are decoded
+    into a dict as well. """
+    if typed:
+        # Woo puts the topic first in compact JSON, so the decoder is picked
+        # from the raw message, because parsing it first would cost as much as
+        # decoding. Only binary messages and messages formatted differently are
+        # parsed for it.
+        is_text = isinstance(msg, str)
+        topic = msg[_TOPIC_START:msg.find('"', _TOPIC_START)] if is_text else None
+        decoder = _TOPIC_DECODERS.get(topic)
+        try:
+            if decoder is None:
+                if is_text and msg.startswith(_TOPIC_MARKER):
+                    decoder = _TOPIC_DECODERS[topic] = _typed_decoder(topic)
+                elif not is_text or '"topic"' in msg:
+                    decoder = _typed_decoder(_ENVELOPE_DECODER.decode(msg).topic)
+            if decoder:
+                return decoder.decode(msg)
+        except msgspec.DecodeError:
+            pass
+    return _loads(msg)
+
+_SESSION = requests.Session()
+_SESSION.mount('https://', requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=32))
+# The connections of an async client are bound to the event loop that opened
+# them, so each running event loop gets a client of its own.
+_ASYNC_CLIENTS: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]' = weakref.WeakKeyDictionary()
+
+@functools.lru_cache(maxsize=4)
+def _hmac_pads(woo_secret: str):
+    """ Returns the inner and outer SHA-256 states of HMAC for the given key.
+    These states only depend on the key, so they are computed once per secret
+    and copied for each signature. """
+    secret = woo_secret.encode('utf-8')
+    if len(secret) > 64:
+        secret = hashlib.sha256(secret).digest()
+    secret = secret.ljust(64, b'\0')
+    ipad_ctx = hashlib.sha256(bytes(b ^ 0x36 for b in secret))
+    opad_ctx = hashlib.sha256(bytes(b ^ 0x5C for b in secret))
+    return ipad_ctx, opad_ctx
+
+def _get_query_string(**params) -> str:
+    """ Returns the sorted query string that is signed for the given parameters.
+    The values are formatted exactly as they are sent, so this is not cached:
+    equal values like 1 and 1.0 would otherwise share a query string. """
+    return '&'.join(f'{key}={value}' for key, value in sorted(params.items()))
+
+def _get_signature(time_ms, woo_secret, query_string: str = ''):
     msg = f"{query_string}|{time_ms}"
-    bytes_key = bytes(woo_secret, "utf-8")
-    bytes_msg = bytes(msg, "utf-8")
-    return hmac.new(bytes_key, msg=bytes_msg, digestmod=hashlib.sha256).hexdigest().upper()
+    ipad_ctx, opad_ctx = _hmac_pads(woo_secret)
+    inner = ipad_ctx.copy()
+    inner.update(msg.encode())
+    outer = opad_ctx.copy()
+    outer.update(inner.digest())
+    return outer.hexdigest().upper()
 
 def _get_headers(woo_key, woo_secret, **params) -> Dict[str, str]:
-    sorted_params = {key: value for key, value in sorted(params.items())}
-    time_ms = int(time.time() * 1000)
+    query_string = _get_query_string(**params)
+    timestamp = str(time.time_ns() // 1_000_000)
     return {
         "Content-Type": "application/x-www-form-urlencoded",
         "x-api-key": woo_key,
-        "x-api-signature": _get_signature(time_ms, woo_secret, **sorted_params),
-        "x-api-timestamp": str(time_ms),
+        "x-api-signature": _get_signature(timestamp, woo_secret, query_string),
+        "x-api-timestamp": timestamp,
     }
 
 def _get_auth_message(woo_key, woo_secret):
-    time_ms = int(time.time() * 1000)
-    return json.dumps({
+    timestamp = str(time.time_ns() // 1_000_000)
+    return _dumps({
         'event': 'auth',
         'params': {
             "apikey": woo_key,
-            "sign": _get_signature(time_ms, woo_secret),
-            "timestamp": str(time_ms)
+            "sign": _get_signature(timestamp, woo_secret),
+            "timestamp": timestamp
         }
     })
 
@@ -51,58 +190,374 @@ def _headers(url, woo_key=None, woo_secret=None, **params):
         raise ValueError(f'The API Secret is required for the private endpoint {url}.')
     return _get_headers(woo_key, woo_secret, **params)
 
+def _prepare(url, woo_key, woo_secret, params):
+    """ Returns the query parameters and headers of a request. The values are
+    converted to the strings that are signed, and None values are left out,
+    such that every HTTP client sends exactly the signed query. """
+    params = {key: str(value) for key, value in params.items() if value is not None}
+    return params, _headers(url, woo_key, woo_secret, **params)
+
 def get(url, woo_key=None, woo_secret=None, **params):
     """ Send an authenticated GET request to the given url. """
-    return requests.get(url, params=params, headers=_headers(url, woo_key, woo_secret, **params))
+    params, headers = _prepare(url, woo_key, woo_secret, params)
+    return _SESSION.get(url, params=params, headers=headers)
 
 def post(url, woo_key, woo_secret, **params):
     """ Send an authenticated POST request to the given url. """
-    return requests.post(url, params=params, headers=_headers(url, woo_key, woo_secret, **params))
+    params, headers = _prepare(url, woo_key, woo_secret, params)
+    return _SESSION.post(url, params=params, headers=headers)
 
 def delete(url, woo_key, woo_secret, **params):
     """ Send an authenticated DELETE request to the given url. """
-    return requests.delete(url, params=params, headers=_headers(url, woo_key, woo_secret, **params))
+    params, headers = _prepare(url, woo_key, woo_secret, params)
+    return _SESSION.delete(url, params=params, headers=headers)
+
+def close():
+    """ Close the pooled HTTP connections used by get(), post() and delete(). """
+    _SESSION.close()
+
+def _async_client():
+    if httpx is None:
+        raise ImportError('The async API requires httpx, install it via `pip install woopy[async]`.')
+    loop = asyncio.get_running_loop()
+    client = _ASYNC_CLIENTS.get(loop)
+    if client is None or client.is_closed:
+        # Clients of closed loops cannot be used anymore, but their connections
+        # refer to their loop, which keeps it from being garbage collected.
+        for closed_loop in [other for other in _ASYNC_CLIENTS if other.is_closed()]:
+            del _ASYNC_CLIENTS[closed_loop]
+        # HTTP/2 multiplexes concurrent requests over a single connection.
+        client = _ASYNC_CLIENTS[loop] = httpx.AsyncClient(http2=h2 is not None)
+    return client
+
+async def _arequest(method, url, woo_key, woo_secret, params):
+    params, headers = _prepare(url, woo_key, woo_secret, params)
+    return await _async_client().request(method, url, params=params, headers=headers)
+
+async def aget(url, woo_key=None, woo_secret=None, **params):
+    """ Send an authenticated GET request to the given url without blocking the event loop. """
+    return await _arequest('GET', url, woo_key, woo_secret, params)
+
+async def apost(url, woo_key, woo_secret, **params):
+    """ Send an authenticated POST request to the given url without blocking the event loop. """
+    return await _arequest('POST', url, woo_key, woo_secret, params)
+
+async def adelete(url, woo_key, woo_secret, **params):
+    """ Send an authenticated DELETE request to the given url without blocking the event loop. """
+    return await _arequest('DELETE', url, woo_key, woo_secret, params)
+
+async def batch(calls: Iterable[Tuple[str, str, Dict[str, Any]]], woo_key=None, woo_secret=None) -> List[Any]:
+    """ Send the given (method, url, params) requests concurrently, and return
+    their responses in the same order. A request that fails is returned as its
+    exception, such that the responses of all other requests are kept. """
+    return await asyncio.gather(*(
+        _arequest(method, url, woo_key, woo_secret, params) for method, url, params in calls
+    ), return_exceptions=True)
+
+async def aclose():
+    """ Close the pooled HTTP connections used by aget(), apost() and adelete()
+    in the running event loop. """
+    client = _ASYNC_CLIENTS.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+@functools.lru_cache(maxsize=None)
+def _topic_frame(topic: str, event: str) -> str:
+    return _dumps({'topic': topic, 'event': event})
 
-async def _listener(url, topics: Iterable[str], msg_queue: queue.Queue, woo_key=None, woo_secret=None):
+_PONG_FRAME = _dumps({'event': 'pong'})
+_PING_MARKER = '"event":"ping"'
+# Handing a message to another thread costs more than decoding a small one.
+_OFFLOAD_SIZE = 2**15
+
+class _Subscriber:
+    """ The message queue of a single receive() call. """
+
+    def __init__(self, topics_by_url: Dict[str, Iterable[str]], typed=False):
+        self.topics_by_url = {url: frozenset(topics) for url, topics in topics_by_url.items()}
+        self.typed = typed
+        # The connection of each url, as assigned by the hub.
+        self.connections: Dict[str, '_Connection'] = {}
+        self.msg_queue: Deque = collections.deque()
+        self.new_msg = threading.Event()
+
+    def put(self, obj):
+        self.msg_queue.append(obj)
+        self.new_msg.set()
+
+class _Connection:
+    """ The websocket connection to a single url, which is shared by all
+    subscribers of that url. Its state is only modified in the event loop of
+    the hub. Messages are decoded and dispatched in the event loop, except for
+    large messages, which are handed to a decoder thread so that they do not
+    hold up reading the websocket. A single decoder thread per connection,
+    which also takes the messages that arrive while it is busy, keeps the
+    messages in order. """
+
+    def __init__(self, url, woo_key=None, woo_secret=None, **connect_options):
+        self.url = url
+        self.is_private = 'private' in url
+        self.key = _connection_key(url, woo_key)
+        self.woo_key = woo_key
+        self.woo_secret = woo_secret
+        self.connect_options = connect_options
+        self.topics: Counter[str] = collections.Counter()
+        # Replaced rather than modified, such that it can be iterated safely.
+        self.subscribers: Tuple[_Subscriber, ...] = ()
+        self.websocket = None
+        self.task: Optional[asyncio.Task] = None
+        self.decoder = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix='woopy-decoder')
+        # The messages that are handed to the decoder thread but not yet dispatched.
+        self.backlog: Deque[concurrent.futures.Future] = collections.deque()
+
+    def dispatch(self, msg: str) -> bool:
+        """ Decodes the message and passes it to the subscribers of its topic.
+        Messages without a (known) topic, like acknowledgements, are passed to
+        all subscribers. The message is decoded once for all subscribers that
+        want dicts and once for all that want typed messages. Returns False if
+        the message is a ping, which is not passed on. """
+        decoded = {}
+        for subscriber in self.subscribers:
+            if subscriber.typed not in decoded:
+                obj = decoded[subscriber.typed] = _decode(msg, subscriber.typed)
+                if isinstance(obj, dict) and obj.get('event') == 'ping':
+                    return False
+            obj = decoded[subscriber.typed]
+            topic = obj.get('topic') if isinstance(obj, dict) else getattr(obj, 'topic', None)
+            if topic not in self.topics or topic in subscriber.topics_by_url[self.url]:
+                subscriber.put(obj)
+        return True
+
+    def _dispatch_or_drop(self, msg: str) -> bool:
+        try:
+            return self.dispatch(msg)
+        except Exception:
+            logger.warning('Dropped a message from %s that could not be decoded:', self.url, exc_info=True)
+            return True
+
+    def _offload(self, msg: str, websocket, loop: asyncio.AbstractEventLoop):
+        if not self._dispatch_or_drop(msg):
+            asyncio.run_coroutine_threadsafe(websocket.send(_PONG_FRAME), loop)
+
+    async def handle(self, msg: str, websocket):
+        """ Decodes and dispatches the message, in the decoder thread if the
+        message is large or if the decoder thread is still busy. The backlog of
+        the decoder thread is bounded by max_queue, such that the websocket is
+        not read further while it is full. """
+        backlog = self.backlog
+        while backlog and backlog[0].done():
+            backlog.popleft()
+        if len(msg) >= _OFFLOAD_SIZE or backlog:
+            max_queue = self.connect_options.get('max_queue')
+            if max_queue is not None and len(backlog) >= max_queue:
+                await asyncio.wrap_future(backlog.popleft())
+            backlog.append(self.decoder.submit(self._offload, msg, websocket, asyncio.get_running_loop()))
+        elif not self._dispatch_or_drop(msg):
+            await websocket.send(_PONG_FRAME)
+
+    async def close(self):
+        """ Stops the listener, which closes the websocket, and the decoder thread. """
+        self.task.cancel()
+        await asyncio.gather(self.task, return_exceptions=True)
+        self.decoder.shutdown(wait=False)
+
+    async def send(self, frame):
+        """ Sends the frame if connected. Otherwise, the listener sends all
+        subscriptions as soon as it reconnects. """
+        if self.websocket is not None:
+            try:
+                await self.websocket.send(frame)
+            except websockets.exceptions.ConnectionClosed:
+                pass
+
+def _connection_key(url, woo_key=None):
+    """ Private streams are specific to an account, so their connections are
+    only shared by subscribers with the same API Key. """
+    return (url, woo_key if 'private' in url else None)
+
+async def _listener(conn: _Connection):
+    url = conn.url
     while True:
+        # Woo's application-level pings are answered as well, but the protocol
+        # pings of websockets detect a dead connection without waiting for them.
+        connections = websockets.client.connect(
+            url, close_timeout=2, ping_interval=20, ping_timeout=20, max_size=2**22, **conn.connect_options
+        ).__aiter__()
         try:
-            async for websocket in websockets.client.connect(url, close_timeout=0.001):
+            async for websocket in connections:
                 try:
-                    if 'private' in url:
-                        if woo_key is None:
+                    if conn.is_private:
+                        if conn.woo_key is None:
                             raise ValueError(f'The API Key is required for the private endpoint {url}.')
-                        if woo_secret is None:
+                        if conn.woo_secret is None:
                             raise ValueError(f'The API Secret is required for the private endpoint {url}.')
-                        await websocket.send(_get_auth_message(woo_key, woo_secret))
-                    for topic in topics:
-                        await websocket.send(json.dumps({'topic': topic, 'event': 'subscribe'}))
+                        await websocket.send(_get_auth_message(conn.woo_key, conn.woo_secret))
+                    # Topics added from here on are sent by the hub itself.
+                    conn.websocket = websocket
+                    for topic in list(conn.topics):
+                        await websocket.send(_topic_frame(topic, 'subscribe'))
                     while True:
                         msg = await websocket.recv()
-                        obj = json.loads(msg)
-                        if isinstance(obj, dict) and obj.get('event') == 'ping':
-                            await websocket.send(json.dumps({'event': 'pong'}))
-                        else:
-                            msg_queue.put(obj)
+                        # Text pings are answered without decoding them. Other
+                        # pings are caught after decoding.
+                        if isinstance(msg, str) and _PING_MARKER in msg[:64]:
+                            await websocket.send(_PONG_FRAME)
+                            continue
+                        await conn.handle(msg, websocket)
                 except websockets.exceptions.ConnectionClosed as cc:
-                    logger.warning(f'Connection at {url} closed: {cc}')
+                    logger.warning('Connection at %s closed: %s', url, cc)
                     continue
+                finally:
+                    conn.websocket = None
+        except asyncio.CancelledError:
+            # Before Python 3.8 this is an Exception, which must not restart.
+            raise
         except Exception:
-            logger.warning(f'Restarting after unexpected exception:', exc_info=True)
-
-async def _all_listeners(topics_by_url: Dict[str, Iterable[str]], msg_queue, woo_key=None, woo_secret=None):
-    tasks = [_listener(url, topics, msg_queue, woo_key, woo_secret) for url, topics in topics_by_url.items()]
-    await asyncio.gather(*tasks)
-            
-def receive(topics_by_url: Dict[str, Iterable[str]], woo_key=None, woo_secret=None) -> Iterable[Dict[str, Any]]:
-    """ Iterates over all incoming message on the registered topics. This method
-    starts a worker thread that runs an event loop that executes one listener
-    task per url. This worker automatically restarts in case of an exception. """
-    msg_queue = queue.Queue(-1)
-    task = _all_listeners(topics_by_url, msg_queue, woo_key, woo_secret)
-    worker = threading.Thread(target=asyncio.run, args=(task,), daemon=True)
-    worker.start()
-    while worker.is_alive():
+            logger.warning('Restarting after unexpected exception:', exc_info=True)
+        finally:
+            # Closes the websocket, also when the listener is cancelled.
+            await connections.aclose()
+
+def _run(coro):
+    """ Runs the coroutine in a new event loop, which is backed by uvloop if it
+    is installed. This leaves the event loop policy of the application as is. """
+    if uvloop is None:
+        return asyncio.run(coro)
+    loop = uvloop.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        asyncio.set_event_loop(None)
+        loop.close()
+
+class _Hub:
+    """ Runs a single event loop in a worker thread, which maintains one shared
+    websocket connection per url for all receive() calls. A connection is
+    opened on the first subscription to its url, and closed after the last
+    subscriber of its url unsubscribes. """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stopped: Optional[asyncio.Future] = None
+        self._task_group = None
+        self._connections: Dict[Tuple[str, Optional[str]], _Connection] = {}
+
+    def is_alive(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _start(self):
+        with self._lock:
+            if self.is_alive():
+                return
+            ready = threading.Event()
+            self._thread = threading.Thread(target=_run, args=(self._serve(ready),), daemon=True)
+            self._thread.start()
+            ready.wait()
+
+    def _call(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    async def _serve(self, ready: threading.Event):
+        self._loop = asyncio.get_running_loop()
+        self._stopped = self._loop.create_future()
+        if hasattr(asyncio, 'TaskGroup'):  # Python 3.11+
+            async with asyncio.TaskGroup() as self._task_group:
+                await self._wait_until_stopped(ready)
+        else:
+            await self._wait_until_stopped(ready)
+
+    async def _wait_until_stopped(self, ready: threading.Event):
+        ready.set()
         try:
-            yield msg_queue.get(timeout=1)
-        except queue.Empty:
-            continue
+            await self._stopped
+        finally:
+            conns = list(self._connections.values())
+            self._connections.clear()
+            await asyncio.gather(*(conn.close() for conn in conns))
+
+    def _create_task(self, coro) -> asyncio.Task:
+        """ Starts the coroutine as a task of the task group of the hub, if
+        available, which guarantees it does not outlive the event loop. """
+        if self._task_group is not None:
+            return self._task_group.create_task(coro)
+        return asyncio.ensure_future(coro)
+
+    def subscribe(self, subscriber: _Subscriber, woo_key=None, woo_secret=None, **connect_options):
+        """ Subscribes to the topics of the subscriber at each of its urls. The
+        connect options only apply to connections that are not open yet, and
+        a warning is logged if they differ from those of an open connection. """
+        self._start()
+        self._call(self._subscribe(subscriber, woo_key, woo_secret, connect_options))
+
+    async def _subscribe(self, subscriber: _Subscriber, woo_key, woo_secret, connect_options):
+        for url, topics in subscriber.topics_by_url.items():
+            key = _connection_key(url, woo_key)
+            conn = self._connections.get(key)
+            if conn is None:
+                conn = self._connections[key] = _Connection(url, woo_key, woo_secret, **connect_options)
+                conn.task = self._create_task(_listener(conn))
+            elif conn.connect_options != connect_options:
+                logger.warning('Connection at %s is already open with options %s, ignoring %s',
+                               url, conn.connect_options, connect_options)
+            subscriber.connections[url] = conn
+            conn.subscribers += (subscriber,)
+            for topic in topics:
+                conn.topics[topic] += 1
+                if conn.topics[topic] == 1:
+                    await conn.send(_topic_frame(topic, 'subscribe'))
+
+    def unsubscribe(self, subscriber: _Subscriber):
+        """ Unsubscribes from the topics of the subscriber that no other
+        subscriber listens to. """
+        if self.is_alive():
+            self._call(self._unsubscribe(subscriber))
+
+    async def _unsubscribe(self, subscriber: _Subscriber):
+        for url, conn in subscriber.connections.items():
+            if subscriber not in conn.subscribers:
+                continue
+            conn.subscribers = tuple(s for s in conn.subscribers if s is not subscriber)
+            if not conn.subscribers:
+                del self._connections[conn.key]
+                await conn.close()
+                continue
+            for topic in subscriber.topics_by_url[url]:
+                conn.topics[topic] -= 1
+                if conn.topics[topic] == 0:
+                    del conn.topics[topic]
+                    await conn.send(_topic_frame(topic, 'unsubscribe'))
+
+    def stop(self):
+        """ Closes all connections and stops the worker thread. """
+        if self.is_alive():
+            self._loop.call_soon_threadsafe(self._stopped.set_result, None)
+            self._thread.join(timeout=5)
+
+_HUB = _Hub()
+atexit.register(_HUB.stop)
+
+def receive(topics_by_url: Dict[str, Iterable[str]], woo_key=None, woo_secret=None, typed=False,
+            compression: Optional[str] = None, max_queue: Optional[int] = 32, read_limit: int = 2**16,
+            write_limit: int = 2**16) -> Iterable[Union[Dict[str, Any], 'Message']]:
+    """ Iterates over all incoming message on the registered topics. This worker
+    automatically restarts in case of an exception. See the README for the
+    typed, compression and buffer options. """
+    if typed and msgspec is None:
+        raise ImportError('Typed messages require msgspec, install it via `pip install woopy[typed]`.')
+    subscriber = _Subscriber(topics_by_url, typed)
+    _HUB.subscribe(subscriber, woo_key, woo_secret, compression=compression, max_queue=max_queue,
+                   read_limit=read_limit, write_limit=write_limit)
+    try:
+        while _HUB.is_alive():
+            # Clear before draining, such that a message appended during the
+            # drain sets the event again and the wait below returns immediately.
+            subscriber.new_msg.clear()
+            while subscriber.msg_queue:
+                yield subscriber.msg_queue.popleft()
+            subscriber.new_msg.wait(1)
+    finally:
+        _HUB.unsubscribe(subscriber)